@@ -2,15 +2,26 @@
 # Intelligent Document Understanding System 
 # ============================================================
 
-import os, re, json, warnings
+import os, re, csv, json, hashlib, tempfile, threading, queue, warnings
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from importlib.metadata import version
 import cv2
 import numpy as np
-import pandas as pd
-from pdf2image import convert_from_path
+from pypdf import PdfReader
 import pytesseract
-import easyocr
-import camelot
-import gradio as gr
+from PIL import Image, ImageOps
+# easyocr/torch, camelot, pdfplumber, pdf2image and gradio are imported where they are used,
+# so importing this module (including in every Tesseract pool worker) stays cheap
+
+# Optional: orjson serializes results several times faster than the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 warnings.filterwarnings("ignore")
 
@@ -18,90 +29,411 @@ warnings.filterwarnings("ignore")
 # Setup
 # -------------------------------
 OUTPUT_DIR = "outputs"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+OCR_CACHE_DIR = os.path.join(OUTPUT_DIR, "ocr_cache")
+os.makedirs(CACHE_DIR, exist_ok=True)
+os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+
+# outputs/output.json mirrors the latest result (cached or not); set SAVE_OUTPUT_JSON=0 to skip it
+SAVE_OUTPUT_JSON = os.environ.get("SAVE_OUTPUT_JSON", "1") == "1"
 
 # Tesseract path (for Colab, you may need to install tesseract)
 pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"
 
-# Lazy-loaded EasyOCR
+# Regex patterns (compiled once, reused on every page)
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+# Bounded, tight character classes keep backtracking cheap on noisy OCR text
+CONTACT_RE = re.compile(
+    r'(?P<urls>\b(?:https?://|www\.)[^\s<>"\']{1,2048}\b)'
+    r'|(?P<emails>\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,24}\b)'
+    r'|(?P<phones>\b\d{7,15}\b)'
+)
+
+# EasyOCR reader (built once, preloaded at app startup)
+OCR_LANGUAGES = ["en"]
+# The lock stops concurrent first requests from each loading their own copy of the model
 ocr_reader = None
+ocr_reader_lock = threading.Lock()
 def get_ocr_reader():
     global ocr_reader
-    if ocr_reader is None:
-        ocr_reader = easyocr.Reader(["en"], gpu=False)
+    with ocr_reader_lock:
+        if ocr_reader is None:
+            import easyocr, torch  # torch is installed with easyocr
+            # Use CUDA when present
+            use_gpu = torch.cuda.is_available()
+            ocr_reader = easyocr.Reader(OCR_LANGUAGES, gpu=use_gpu, cudnn_benchmark=use_gpu)
     return ocr_reader
 
 # -------------------------------
 # File Loading
 # -------------------------------
+MIN_TEXT_LAYER_CHARS = 40
+MAX_IMAGE_DIM = 1800
+RENDER_BATCH_PAGES = 8
+
+def downscale_image(img, max_dim=MAX_IMAGE_DIM):
+    # OCR cost grows with pixel count; shrink only pages whose long edge exceeds the cap
+    h, w = img.shape[:2]
+    scale = max_dim / max(h, w)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def rasterize_pdf(path, first_page=None, last_page=None):
+    # Poppler renders page ranges on all cores; pages stay RGB, as EasyOCR wants them
+    from pdf2image import convert_from_path
+    pages = convert_from_path(
+        path, dpi=200, first_page=first_page, last_page=last_page,
+        thread_count=os.cpu_count() or 1, fmt="jpeg", jpegopt={"quality": 90}
+    )
+    return [downscale_image(np.asarray(page)) for page in pages]
+
+def read_text_layer(path):
+    try:
+        return [page.extract_text() or "" for page in PdfReader(path).pages]
+    except Exception:
+        return []
+
+def page_runs(page_numbers, max_len=RENDER_BATCH_PAGES):
+    # Consecutive pages become one (first, last) range, capped so OCR can start early
+    runs = []
+    for n in page_numbers:
+        if runs and n == runs[-1][1] + 1 and n - runs[-1][0] < max_len:
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return runs
+
+def render_in_background(path, runs):
+    # Poppler renders the next run while the caller OCRs the previous one;
+    # the small queue keeps rendering at most two runs ahead of Tesseract
+    rendered = queue.Queue(maxsize=2)
+    stop = threading.Event()
+
+    def put(item):
+        # Re-check the stop flag while waiting, so an abandoned request frees the thread
+        while not stop.is_set():
+            try:
+                rendered.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def render():
+        try:
+            for first, last in runs:
+                images = rasterize_pdf(path, first_page=first, last_page=last)
+                if not put([(n - 1, img) for n, img in zip(range(first, last + 1), images)]):
+                    return
+        except Exception as e:
+            put(e)
+        put(None)
+
+    threading.Thread(target=render, daemon=True).start()
+    try:
+        for batch in iter(rendered.get, None):
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
+    finally:
+        stop.set()
+
+def load_pdf_pages(path):
+    # Born-digital pages come back as their text layer; only scanned pages are rasterized
+    from pdf2image import pdfinfo_from_path
+    texts = read_text_layer(path) or [""] * pdfinfo_from_path(path)["Pages"]
+    scanned = [n for n, text in enumerate(texts, start=1) if len(text.strip()) < MIN_TEXT_LAYER_CHARS]
+    pages = list(texts)
+    for n in scanned:
+        pages[n - 1] = None
+    return pages, render_in_background(path, page_runs(scanned))
+
 def load_images(file):
+    # Returns text-layer pages (None where OCR is needed) and batches of (index, image) to OCR
     path = file.name
-    images = []
 
     if path.lower().endswith(".pdf"):
-        pages = convert_from_path(path, dpi=200)
-        for page in pages:
-            images.append(cv2.cvtColor(np.array(page), cv2.COLOR_RGB2BGR))
+        pages, batches = load_pdf_pages(path)
     elif path.lower().endswith((".png", ".jpg", ".jpeg")):
-        images.append(cv2.imread(path))
+        # Decode once straight to RGB (honouring EXIF rotation, as cv2.imread did)
+        with Image.open(path) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ("I", "I;16", "I;16B", "I;16L"):
+                # 16-bit grayscale: scale down to 8 bits like cv2.imread; convert("RGB") clips at 255
+                gray = (np.clip(np.asarray(image), 0, 65535) >> 8).astype(np.uint8)
+                img = cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+            else:
+                img = np.asarray(image.convert("RGB"))
+        img = downscale_image(img)
+        pages, batches = [None], [[(0, img)]]
     else:
         raise ValueError("Unsupported file type")
 
-    return images, path
+    return pages, batches, path
 
 # -------------------------------
 # Image Preprocessing (Minimal)
 # -------------------------------
 def preprocess_for_tesseract(img):
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
     return gray  # minimal preprocessing for speed
 
-def preprocess_for_easyocr(img):
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    blur = cv2.medianBlur(gray, 3)
-    return cv2.adaptiveThreshold(
-        blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 2
-    )
-
 # -------------------------------
 # OCR Extraction (Smart)
 # -------------------------------
-def extract_text(img):
-    # First try Tesseract (fast)
-    try:
-        text = pytesseract.image_to_string(preprocess_for_tesseract(img), config="--oem 1 --psm 6")
-    except:
-        text = ""
+# Point TESSDATA_DIR at a tessdata_fast checkout to run the faster integer LSTM models
+TESSDATA_DIR = os.environ.get("TESSDATA_DIR")
+TESSERACT_CONFIG = "--oem 1 --psm 6" + (f' --tessdata-dir "{TESSDATA_DIR}"' if TESSDATA_DIR else "")
+MIN_TESSERACT_CHARS = 40
+MIN_TESSERACT_CONF = 60
+# Detector cost scales with H*W; printed text stays legible with a 1280px long edge
+EASYOCR_MAX_DIM = 1280
+EASYOCR_BATCH_SIZE = 8
+
+def summarize_words(words):
+    # Page text together with Tesseract's mean word confidence
+    if not words:
+        return "", 0.0
+    return " ".join(w for w, _ in words), sum(c for _, c in words) / len(words)
+
+def extract_tesserocr_page(img):
+    # The worker's API keeps the model loaded; only the image changes per page
+    tess_api.SetImage(Image.fromarray(preprocess_for_tesseract(img)))
+    return summarize_words([(w, c) for w, c in tess_api.MapWordConfidences() if w.strip() and c >= 0])
+
+def extract_tesseract_batch(images):
+    if tess_api is not None:
+        return [extract_tesserocr_page(img) for img in images]
+
+    # One tesseract run reads every page from a list file, so the model loads once per batch
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        # Uncompressed PGM: no zlib encode here and no PNG decode inside tesseract
+        for i, img in enumerate(images):
+            path = os.path.join(tmp_dir, f"page_{i}.pgm")
+            cv2.imwrite(path, preprocess_for_tesseract(img))
+            paths.append(path)
+        list_path = os.path.join(tmp_dir, "pages.txt")
+        with open(list_path, "w") as f:
+            f.write("\n".join(paths) + "\n")
+
+        try:
+            data = pytesseract.image_to_data(
+                list_path, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT
+            )
+        except:
+            return [("", 0.0)] * len(images)
+
+    # Rows carry a 1-based page_num matching the order of the list file
+    pages = [[] for _ in images]
+    for page_num, w, c in zip(data["page_num"], data["text"], data["conf"]):
+        if w.strip() and c >= 0:
+            pages[page_num - 1].append((w, c))
+    return [summarize_words(words) for words in pages]
+
+def extract_easyocr_texts(images):
+    # Batched detector passes instead of one call per page; the batch size caps peak memory
+    reader = get_ocr_reader()
+    # EasyOCR's detector normalizes raw RGB input itself, so pages only need downscaling
+    processed = [downscale_image(img, EASYOCR_MAX_DIM) for img in images]
+
+    # readtext_batched resizes every image to one size, so only same-shaped pages share a batch;
+    # that keeps aspect ratios and makes each page's text independent of its batch mates
+    by_shape = {}
+    for i, img in enumerate(processed):
+        by_shape.setdefault(img.shape[:2], []).append(i)
+
+    texts = [""] * len(images)
+    for (h, w), indices in by_shape.items():
+        for start in range(0, len(indices), EASYOCR_BATCH_SIZE):
+            chunk = indices[start:start + EASYOCR_BATCH_SIZE]
+            batched = reader.readtext_batched(
+                [processed[i] for i in chunk], n_width=w, n_height=h, detail=0
+            )
+            for i, lines in zip(chunk, batched):
+                texts[i] = "\n".join(lines)
+    return texts
+
+def warmup_ocr_reader():
+    # One dummy portrait page at the capped size so the first request skips kernel setup
+    blank = np.zeros((1, EASYOCR_MAX_DIM, EASYOCR_MAX_DIM * 3 // 4, 3), np.uint8)
+    get_ocr_reader().readtext_batched(blank, detail=0)
+
+def open_tess_api():
+    # Optional: in-process libtesseract (pip install tesserocr) skips the tesseract subprocess.
+    # Imported here so a worker's OpenMP limits are already set when libgomp loads and reads them
+    import tesserocr
+    options = {"path": TESSDATA_DIR} if TESSDATA_DIR else {}
+    return tesserocr.PyTessBaseAPI(
+        lang="eng", oem=tesserocr.OEM.LSTM_ONLY, psm=tesserocr.PSM.SINGLE_BLOCK, **options
+    )
 
-    # If Tesseract fails or text is too short, fallback to EasyOCR
-    if len(text.strip()) < 40:
-        reader = get_ocr_reader()
-        processed_img = preprocess_for_easyocr(img)
-        text = "\n".join(reader.readtext(processed_img, detail=0))
+@lru_cache(maxsize=1)
+def tesseract_backend():
+    # tesserocr may be missing, or import fine yet fail to load its model (no eng.traineddata,
+    # bad TESSDATA_DIR); then every page goes through the pytesseract list-file path instead
+    try:
+        open_tess_api().End()
+    except (ImportError, RuntimeError):
+        return "pytesseract"
+    return "tesserocr"
+
+# Per-worker tesserocr API (None when the pytesseract path is in use)
+tess_api = None
+def init_tesseract_worker(backend):
+    # The pool already uses every core; keep OpenMP and OpenCV in each worker single-threaded
+    global tess_api
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    os.environ["OMP_NUM_THREADS"] = "1"
+    cv2.setNumThreads(1)
+
+    # A failing initializer would break the pool on every request, so fall back instead
+    if backend == "tesserocr":
+        try:
+            tess_api = open_tess_api()
+        except RuntimeError:
+            tess_api = None
+
+# Tesseract worker pool (started once, reused by every request)
+tesseract_pool = None
+tesseract_pool_lock = threading.Lock()
+def get_tesseract_pool():
+    global tesseract_pool
+    with tesseract_pool_lock:
+        if tesseract_pool is None:
+            # spawn, not fork: pages are submitted while the render thread is running
+            tesseract_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                initializer=init_tesseract_worker, initargs=(tesseract_backend(),),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return tesseract_pool
+
+def submit_tesseract(images):
+    # Pages are split into one batch per core; each worker runs a single-threaded Tesseract.
+    # Render runs are at most RENDER_BATCH_PAGES long, so with that many cores the pytesseract
+    # list files hold one page each and tesseract still starts per page; parallelism wins over
+    # fewer model loads here, and the tesserocr path avoids the per-page start entirely
+    size = -(-len(images) // (os.cpu_count() or 1))
+    pool = get_tesseract_pool()
+    return [pool.submit(extract_tesseract_batch, images[i:i + size]) for i in range(0, len(images), size)]
+
+def drop_tesseract_pool():
+    # A worker died; drop the pool so the next request starts a fresh one
+    global tesseract_pool
+    with tesseract_pool_lock:
+        tesseract_pool = None
+
+def extract_ocr_texts(images, results):
+    # Tesseract (fast) has already run on every page
+    texts = [text for text, _ in results]
+
+    # Only pages Tesseract read poorly (short or low-confidence) fall back to EasyOCR together
+    fallback = [
+        i for i, (text, conf) in enumerate(results)
+        if len(text) < MIN_TESSERACT_CHARS or conf < MIN_TESSERACT_CONF
+    ]
+    if fallback:
+        for i, text in zip(fallback, extract_easyocr_texts([images[i] for i in fallback])):
+            texts[i] = text
+
+    return texts
 
-    return normalize_text(text)
+# -------------------------------
+# OCR Cache
+# -------------------------------
+# Anything that changes OCR output for the same pixels belongs in the key;
+# built on first use because probing the Tesseract backend loads its model
+@lru_cache(maxsize=1)
+def ocr_cache_salt():
+    return "|".join(str(v) for v in (
+        TESSERACT_CONFIG, MIN_TESSERACT_CHARS, MIN_TESSERACT_CONF,
+        EASYOCR_MAX_DIM, version("easyocr"), tesseract_backend()
+    ))
+
+def page_fingerprint(img):
+    digest = hashlib.blake2b(ocr_cache_salt().encode(), digest_size=16)
+    digest.update(str(img.shape).encode())
+    digest.update(np.ascontiguousarray(img).data)
+    return digest.hexdigest()
+
+def load_cached_ocr(key):
+    cache_path = f"{OCR_CACHE_DIR}/{key}.txt"
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, encoding="utf-8") as f:
+        return f.read()
+
+def extract_texts(pages, batches):
+    # Pages already read from the PDF text layer skip OCR entirely
+    texts = list(pages)
+    keys, todo, jobs, repeats = {}, [], [], []
+    queued = set()
+
+    # Tesseract starts on each rendered batch while the next one is still rendering;
+    # pages stay in todo until the EasyOCR fallback below has seen them
+    try:
+        for batch in batches:
+            pending = []
+            for i, img in batch:
+                # Scanned pages seen before (same pixels, same OCR settings) come from the OCR cache
+                keys[i] = page_fingerprint(img)
+                texts[i] = load_cached_ocr(keys[i])
+                if texts[i] is not None:
+                    continue
+                # Identical pages (blank pages, repeated forms) are OCR'd once per document
+                if keys[i] in queued:
+                    repeats.append(i)
+                else:
+                    queued.add(keys[i])
+                    pending.append((i, img))
+            if pending:
+                todo.extend(pending)
+                jobs.append(submit_tesseract([img for _, img in pending]))
+
+        results = [page for futures in jobs for future in futures for page in future.result()]
+    except BrokenProcessPool:
+        drop_tesseract_pool()
+        raise
+    finally:
+        # Stops the PDF render thread if OCR bailed out part way through the document
+        if hasattr(batches, "close"):
+            batches.close()
+
+    for (i, _), text in zip(todo, extract_ocr_texts([img for _, img in todo], results)):
+        texts[i] = text
+        write_atomic(f"{OCR_CACHE_DIR}/{keys[i]}.txt", text.encode("utf-8"))
+
+    ocr_by_key = {keys[i]: texts[i] for i, _ in todo}
+    for i in repeats:
+        texts[i] = ocr_by_key[keys[i]]
+
+    return [normalize_text(text) for text in texts]
 
 def normalize_text(text):
-    return re.sub(r"\s+", " ", text).strip()
+    # str.split() uses the same whitespace set as \s but needs no regex engine
+    return " ".join(text.split())
 
 # -------------------------------
 # Text Structuring
 # -------------------------------
-def split_paragraphs(text, max_len=250):
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    paragraphs, buffer = [], ""
+def split_paragraphs(sentences, max_len=250):
+    paragraphs, buffer, buffer_len = [], [], 0
     for s in sentences:
-        buffer += s + " "
-        if len(buffer) >= max_len:
-            paragraphs.append(buffer.strip())
-            buffer = ""
-    if buffer.strip():
-        paragraphs.append(buffer.strip())
+        buffer.append(s)
+        buffer_len += len(s) + 1
+        if buffer_len >= max_len:
+            paragraphs.append(" ".join(buffer).strip())
+            buffer, buffer_len = [], 0
+    paragraph = " ".join(buffer).strip()
+    if paragraph:
+        paragraphs.append(paragraph)
     return paragraphs
 
 def detect_headings(text):
-    lines = text.split(". ")
-    return [l.strip() for l in lines if 5 < len(l) < 80 and l[0].isupper() and not l.endswith(".")]
+    # The length test runs first; the trailing "." check is an index comparison, not endswith()
+    return [l.strip() for l in text.split(". ") if 5 < len(l) < 80 and l[0].isupper() and l[-1] != "."]
 
 # -------------------------------
 # Key-Value & Contact Extraction
@@ -115,36 +447,99 @@ def extract_key_values(text):
     return kv
 
 def extract_contacts(text):
-    return {
-        "emails": re.findall(r'\b[\w\.-]+@[\w\.-]+\.\w+\b', text),
-        "phones": re.findall(r'\b\d{7,15}\b', text),
-        "urls": re.findall(r'https?://\S+', text)
+    # One scan for all three patterns; each match is bucketed by the group that fired
+    contacts = {"emails": [], "phones": [], "urls": []}
+    for match in CONTACT_RE.finditer(text):
+        contacts[match.lastgroup].append(match.group())
+    return contacts
+
+# -------------------------------
+# Page Parsing
+# -------------------------------
+def parse_page(page_number, text):
+    # Split sentences once; the paragraphs here and the abstract later both reuse them
+    sentences = SENTENCE_SPLIT_RE.split(text)
+    page = {
+        "page": page_number,
+        "headings": detect_headings(text),
+        "paragraphs": split_paragraphs(sentences),
+        "key_values": extract_key_values(text),
+        "contacts": extract_contacts(text),
+        "raw_text": text
     }
+    return page, sentences
 
 # -------------------------------
 # Table Extraction
 # -------------------------------
-def extract_tables(pdf_path, text):
+TABLE_TRIGGERS = ("table", "total", "amount", "price")
+
+def has_table_trigger(text):
+    # Lowercase once, then plain substring tests for the literal trigger words
+    lowered = text.lower()
+    return any(k in lowered for k in TABLE_TRIGGERS)
+
+def extract_tables(pdf_path, page_texts):
     if not pdf_path.lower().endswith(".pdf"):
         return []
 
-    if not any(k in text.lower() for k in ["table", "total", "amount", "price"]):
+    # Page text is already known from OCR / the text layer, so pick trigger pages from it
+    table_pages = [n for n, text in enumerate(page_texts, start=1) if has_table_trigger(text)]
+    if not table_pages:
         return []
 
-    tables = camelot.read_pdf(pdf_path, pages="all", flavor="stream")
+    import pdfplumber
+    # pdfplumber works straight off the text layer and only opens the trigger pages
+    by_page = {}
+    with pdfplumber.open(pdf_path, pages=table_pages) as pdf:
+        for page in pdf.pages:
+            by_page[page.page_number] = page.extract_tables()
+
+    # Camelot only re-parses the trigger pages where pdfplumber found no table
+    missed = [n for n in table_pages if not by_page.get(n)]
+    if missed:
+        import camelot
+        pages = ",".join(str(n) for n in missed)
+        for table in camelot.read_pdf(pdf_path, pages=pages, flavor="stream", suppress_stdout=True):
+            by_page.setdefault(int(table.page), []).append(table.data)
+
+    # Tables stay in page order whichever extractor found them
+    tables = [rows for n in table_pages for rows in by_page.get(n, [])]
+
+    # Rows go straight into the records; no intermediate DataFrame per table
     result = []
-    for i, table in enumerate(tables):
-        csv_path = f"{OUTPUT_DIR}/table_{i}.csv"
-        table.df.to_csv(csv_path, index=False)
-        result.append(table.df.to_dict(orient="records"))
+    for rows in tables:
+        width = max((len(row) for row in rows), default=0)
+        header = [str(c) for c in range(width)]
+        result.append([
+            dict(zip(header, [cell or "" for cell in row] + [""] * (width - len(row)))) for row in rows
+        ])
     return result
 
+def write_tables(tables):
+    # outputs/table_{i}.csv mirror the latest document; drop leftovers from a previous one
+    for name in os.listdir(OUTPUT_DIR):
+        if re.fullmatch(r"table_\d+\.csv", name):
+            os.remove(os.path.join(OUTPUT_DIR, name))
+    for i, records in enumerate(tables):
+        with open(f"{OUTPUT_DIR}/table_{i}.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(list(records[0]) if records else [])
+            writer.writerows(list(record.values()) for record in records)
+
 # -------------------------------
 # Keyword-Based Abstract
 # -------------------------------
-def build_abstract(text, keywords):
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    matched = [s for s in sentences if any(k.lower() in s.lower() for k in keywords)]
+@lru_cache(maxsize=32)
+def keyword_pattern(keywords):
+    # One alternation over all keywords, so each sentence is scanned once instead of once per keyword
+    return re.compile("|".join(re.escape(k.lower()) for k in keywords))
+
+def build_abstract(sentences, keywords):
+    matched = []
+    if keywords:
+        search = keyword_pattern(tuple(keywords)).search
+        matched = [s for s in sentences if search(s.lower())]
     summary = " ".join(matched[:4]) if matched else "The document content is limited. Provided keywords indicate the primary subject matter."
     return {
         "keywords": keywords,
@@ -152,31 +547,94 @@ def build_abstract(text, keywords):
         "evidence_sentences": matched[:6]
     }
 
+# -------------------------------
+# Result Cache
+# -------------------------------
+HASH_CHUNK_SIZE = 1 << 20
+RESULT_CACHE_SIZE = 32
+# Bump when the result layout changes so old cache entries are not served
+RESULT_FORMAT_VERSION = 1
+
+# Most recent results stay in memory so repeat clicks skip even the disk read;
+# the lock keeps concurrent requests from reordering/evicting under each other
+result_cache = OrderedDict()
+result_cache_lock = threading.Lock()
+
+def document_fingerprint(path, keywords_text):
+    # Same file bytes + same keywords + same OCR settings => same result; hashed in 1 MiB chunks
+    digest = hashlib.blake2b(f"{RESULT_FORMAT_VERSION}|{ocr_cache_salt()}".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    digest.update(keywords_text.encode())
+    return digest.hexdigest()
+
+def dump_json(result):
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8")
+
+def load_json(payload):
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+def write_atomic(path, payload):
+    # Write beside the target and swap it in, so concurrent requests never see a partial file
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+        f.write(payload)
+    os.replace(f.name, path)
+
+def remember_result(key, result):
+    with result_cache_lock:
+        result_cache[key] = result
+        result_cache.move_to_end(key)
+        while len(result_cache) > RESULT_CACHE_SIZE:
+            result_cache.popitem(last=False)
+
+def load_cached_result(key):
+    with result_cache_lock:
+        if key in result_cache:
+            result_cache.move_to_end(key)
+            return result_cache[key]
+
+    cache_path = f"{CACHE_DIR}/{key}.json"
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, "rb") as f:
+        result = load_json(f.read())
+    remember_result(key, result)
+    return result
+
+def save_outputs(result, payload=None):
+    # The files under outputs/ always describe the latest request, including cache hits
+    write_tables(result["tables"])
+    if SAVE_OUTPUT_JSON:
+        write_atomic(f"{OUTPUT_DIR}/output.json", payload or dump_json(result))
+
 # -------------------------------
 # Main Processing Pipeline
 # -------------------------------
 def process_document(file, keywords_text):
     try:
+        cache_key = document_fingerprint(file.name, keywords_text)
+        cached = load_cached_result(cache_key)
+        if cached is not None:
+            save_outputs(cached)
+            return cached
+
         keywords = [k.strip() for k in keywords_text.split(",") if k.strip()]
-        images, path = load_images(file)
+        pages, batches, path = load_images(file)
 
         pages_data = []
-        full_text = ""
-
-        for i, img in enumerate(images, start=1):
-            text = extract_text(img)
-            full_text += text + " "
-            pages_data.append({
-                "page": i,
-                "headings": detect_headings(text),
-                "paragraphs": split_paragraphs(text),
-                "key_values": extract_key_values(text),
-                "contacts": extract_contacts(text),
-                "raw_text": text
-            })
-
-        abstract = build_abstract(full_text, keywords)
-        tables = extract_tables(path, full_text)
+        sentences = []
+        page_texts = extract_texts(pages, batches)
+
+        for i, text in enumerate(page_texts, start=1):
+            page, page_sentences = parse_page(i, text)
+            pages_data.append(page)
+            sentences.extend(page_sentences)
+
+        abstract = build_abstract(sentences, keywords)
+        tables = extract_tables(path, page_texts)
 
         result = {
             "abstract": abstract,
@@ -184,8 +642,11 @@ def process_document(file, keywords_text):
             "pages": pages_data
         }
 
-        with open(f"{OUTPUT_DIR}/output.json", "w") as f:
-            json.dump(result, f, indent=4)
+        # Serialize once; the same bytes go to output.json and the cache entry
+        payload = dump_json(result)
+        write_atomic(f"{CACHE_DIR}/{cache_key}.json", payload)
+        save_outputs(result, payload)
+        remember_result(cache_key, result)
 
         return result
 
@@ -196,15 +657,20 @@ def process_document(file, keywords_text):
 # -------------------------------
 # Gradio UI
 # -------------------------------
-iface = gr.Interface(
-    fn=process_document,
-    inputs=[gr.File(label="Upload PDF/Image"), gr.Textbox(label="Keywords (comma-separated)")],
-    outputs=gr.JSON(label="Structured Output"),
-    title="Intelligent Document Understanding System",
-    description="Fast, CPU-friendly, keyword-driven, layout-aware document processing system"
-)
+def build_interface():
+    import gradio as gr
+    return gr.Interface(
+        fn=process_document,
+        inputs=[gr.File(label="Upload PDF/Image"), gr.Textbox(label="Keywords (comma-separated)")],
+        outputs=gr.JSON(label="Structured Output"),
+        title="Intelligent Document Understanding System",
+        description="Fast, CPU-friendly, keyword-driven, layout-aware document processing system"
+    )
 
-iface.launch()
+if __name__ == "__main__":
+    # Load and warm up the EasyOCR model during boot rather than inside the first request
+    warmup_ocr_reader()
+    build_interface().launch()
 
 
 
@@ -0,0 +1,54 @@
+import sys
+import types
+
+import document_processor as dp
+
+
+class FakePage:
+    def __init__(self, page_number, tables):
+        self.page_number = page_number
+        self.tables = tables
+
+    def extract_tables(self):
+        return self.tables
+
+
+class FakePdf:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeCamelotTable:
+    def __init__(self, page, data):
+        self.page = page
+        self.data = data
+
+
+def test_camelot_fills_only_pages_pdfplumber_missed(monkeypatch):
+    # Page 1 has a ruled table pdfplumber finds; page 2 only Camelot's stream parser finds
+    plumber_pages = {1: [[["a", "b"], ["1", None]]], 2: []}
+    camelot_calls = []
+
+    def open_pdf(path, pages):
+        return FakePdf([FakePage(n, plumber_pages[n]) for n in pages])
+
+    def read_pdf(path, pages, **kwargs):
+        camelot_calls.append(pages)
+        return [FakeCamelotTable("2", [["x", "y"], ["3", "4"]])]
+
+    monkeypatch.setitem(sys.modules, "pdfplumber", types.SimpleNamespace(open=open_pdf))
+    monkeypatch.setitem(sys.modules, "camelot", types.SimpleNamespace(read_pdf=read_pdf))
+
+    tables = dp.extract_tables("doc.pdf", ["Table one", "Total amount"])
+
+    assert camelot_calls == ["2"]
+    assert tables == [
+        [{"0": "a", "1": "b"}, {"0": "1", "1": ""}],
+        [{"0": "x", "1": "y"}, {"0": "3", "1": "4"}],
+    ]